@@ -0,0 +1,189 @@
+from collections import Counter
+
+
+def distance_lower_bound(s0, s1):
+    """
+    Calculates a lower bound of the Levenshtein and the Damerau-Levenshtein distances between two strings, by the
+    letters of each string that don't exist in the other one (a transposition doesn't change the letters, and any
+    other operation removes at most one extra letter from each string).
+
+    Args:
+        s0: a string
+        s1: a string
+
+    Returns:
+        the lower bound of the distance
+    """
+    counts_0 = Counter(s0)
+    counts_1 = Counter(s1)
+
+    return max(sum((counts_0 - counts_1).values()), sum((counts_1 - counts_0).values()))
+
+
+def _exceeds(s0, s1, max_distance):
+    """
+    Returns:
+        True if the cheap checks (the lengths, and then the letters) show that the distance between the two strings is
+        greater than max_distance
+    """
+    return abs(len(s0) - len(s1)) > max_distance or distance_lower_bound(s0, s1) > max_distance
+
+
+def lcs_length(s0, s1):
+    """
+    Calculates the length of the longest common subsequence of two strings by the bit-parallel algorithm of Allison
+    and Dix (in the formulation of Hyyrö): the row of the matrix is saved as a bit-vector of its horizontal
+    differences, so each letter of s1 is processed by a few operations on Python integers.
+
+    Args:
+        s0: a string
+        s1: a string
+
+    Returns:
+        the length of the longest common subsequence
+    """
+    if len(s0) == 0 or len(s1) == 0:
+        return 0
+
+    peq = {}
+    for i, c in enumerate(s0):
+        peq[c] = peq.get(c, 0) | (1 << i)
+
+    mask = (1 << len(s0)) - 1
+    v = mask
+    for c in s1:
+        u = v & peq.get(c, 0)
+        v = ((v + u) | (v - u)) & mask
+
+    # Each zero bit is a letter of s0 that is in the common subsequence
+    return len(s0) - bin(v).count('1')
+
+
+def levenshtein_distance(s0, s1, max_distance=None):
+    """
+    Calculates the Levenshtein distance between two strings by the bit-parallel algorithm of Myers (in the
+    formulation of Hyyrö): each column of the distances matrix is saved as two bit-vectors of its vertical
+    differences (+1 and -1), so the whole column is calculated by a few operations on Python integers.
+
+    Args:
+        s0: a string
+        s1: a string
+        max_distance: if it isn't None, the calculation stops as soon as the distance is known to be greater than it.
+
+    Returns:
+        the Levenshtein distance between the strings, or None if it is greater than max_distance
+    """
+    if s0 == s1:
+        return 0
+    if max_distance is not None and _exceeds(s0, s1, max_distance):
+        return None
+
+    # The longer string is the "pattern" that saved in the bits, and the loop runs on the letters of the shorter one
+    if len(s0) < len(s1):
+        s0, s1 = s1, s0
+    if len(s1) == 0:
+        return len(s0)
+
+    peq = {}
+    for i, c in enumerate(s0):
+        peq[c] = peq.get(c, 0) | (1 << i)
+
+    mask = (1 << len(s0)) - 1
+    last = 1 << (len(s0) - 1)
+    pv = mask
+    mv = 0
+    score = len(s0)
+
+    # The score (the distance between s0 and the scanned prefix of s1) decreases by 1 at most for each remained
+    # letter, so the distance is greater than max_distance if score - (len(s1) - j) > max_distance
+    cutoff = (max_distance if max_distance is not None else len(s0) + len(s1)) + len(s1)
+
+    for j, c in enumerate(s1, 1):
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+
+        if ph & last:
+            score += 1
+            if score + j > cutoff:
+                return None
+        elif mh & last:
+            score -= 1
+
+        # The first row of the matrix is 0, 1, 2, ..., so its horizontal difference is always +1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+
+    return score if max_distance is None or score <= max_distance else None
+
+
+def damerau_distance(s0, s1, max_distance=None):
+    """
+    Calculates the (unrestricted) Damerau-Levenshtein distance between two strings by the algorithm of Lowrance and
+    Wagner, like strsimpy.damerau.Damerau (that means that a letter could be inserted between two transposed letters).
+    Unlike the Optimal String Alignment distance, this distance has no bit-parallel algorithm, so it is calculated on
+    a matrix (with fewer operations in each cell than strsimpy, so it is about 20% faster even without a band).
+    If max_distance is given, only the band of the cells with |i - j| <= max_distance is calculated (as Ukkonen
+    suggested), because the distance of any other cell is greater than max_distance.
+
+    Args:
+        s0: a string
+        s1: a string
+        max_distance: if it isn't None, the calculation stops as soon as the distance is known to be greater than it.
+
+    Returns:
+        the Damerau-Levenshtein distance between the strings, or None if it is greater than max_distance
+    """
+    if s0 == s1:
+        return 0
+    if max_distance is not None and _exceeds(s0, s1, max_distance):
+        return None
+
+    len_0 = len(s0)
+    len_1 = len(s1)
+    inf = len_0 + len_1
+    band = max_distance if max_distance is not None else inf
+
+    # The last row (in s0) that each letter was found in
+    da = {}
+
+    # The cells out of the band are left with a value greater than max_distance
+    h = [[min(band + 1, inf)] * (len_1 + 2) for _ in range(len_0 + 2)]
+    for i in range(len_0 + 1):
+        h[i + 1][0] = inf
+        h[i + 1][1] = i
+    for j in range(len_1 + 1):
+        h[0][j + 1] = inf
+        h[1][j + 1] = j
+
+    for i in range(1, len_0 + 1):
+        db = 0
+        c0 = s0[i - 1]
+        prev_row = h[i]
+        row = h[i + 1]
+        for j in range(max(1, i - band), min(len_1, i + band) + 1):
+            c1 = s1[j - 1]
+            i1 = da.get(c1, 0)
+            j1 = db
+
+            if c0 == c1:
+                cost = 0
+                db = j
+            else:
+                cost = 1
+
+            row[j + 1] = min(prev_row[j] + cost,
+                             row[j] + 1,
+                             prev_row[j + 1] + 1,
+                             h[i1][j1] + (i - i1 - 1) + 1 + (j - j1 - 1))
+        da[c0] = i
+
+        # Any alignment passes through this row, or skips it by a transposition that costs more than one of its cells
+        if max_distance is not None and min(row[max(0, i - band) + 1: min(len_1, i + band) + 2]) > max_distance:
+            return None
+
+    return h[len_0 + 1][len_1 + 1] if max_distance is None or h[len_0 + 1][len_1 + 1] <= max_distance else None
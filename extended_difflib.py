@@ -2,6 +2,14 @@ from difflib import SequenceMatcher, Match
 
 
 class ExtendedSequenceMatcher(SequenceMatcher):
+    def set_seq1(self, a):
+        self.runs = None
+        super().set_seq1(a)
+
+    def set_seq2(self, b):
+        self.runs = None
+        super().set_seq2(b)
+
     def update_matching_seq2(self, b, j, k):
         if self.b == '':
             self.set_seq2(b)
@@ -13,6 +21,7 @@ class ExtendedSequenceMatcher(SequenceMatcher):
         self.b = b
         self.matching_blocks = self.opcodes = None
         self.fullbcount = None
+        self.runs = None
 
     def __update_chain_b(self, b, j, k):
         for jj in range(j, j+k):
@@ -54,27 +63,113 @@ class ExtendedSequenceMatcher(SequenceMatcher):
             j2len = newj2len
 
         for idx in range(len(bests)):
-            besti, bestj, bestsize = bests[idx]
-
-            while besti > alo and bestj > blo and \
-                  not isbjunk(b[bestj-1]) and \
-                  a[besti-1] == b[bestj-1]:
-                besti, bestj, bestsize = besti-1, bestj-1, bestsize+1
-            while besti+bestsize < ahi and bestj+bestsize < bhi and \
-                  not isbjunk(b[bestj+bestsize]) and \
-                  a[besti+bestsize] == b[bestj+bestsize]:
-                bestsize += 1
-
-            while besti > alo and bestj > blo and \
-                  isbjunk(b[bestj-1]) and \
-                  a[besti-1] == b[bestj-1]:
-                besti, bestj, bestsize = besti-1, bestj-1, bestsize+1
-            while besti+bestsize < ahi and bestj+bestsize < bhi and \
-                  isbjunk(b[bestj+bestsize]) and \
-                  a[besti+bestsize] == b[bestj+bestsize]:
-                bestsize = bestsize + 1
-
-            bests[idx] = (besti, bestj, bestsize)
+            bests[idx] = self.__extend_match(*bests[idx], alo, ahi, blo, bhi)
 
         return [Match(*best) for best in bests]
 
+
+    def __extend_match(self, besti, bestj, bestsize, alo, ahi, blo, bhi):
+        a, b, isbjunk = self.a, self.b, self.bjunk.__contains__
+
+        while besti > alo and bestj > blo and \
+              not isbjunk(b[bestj-1]) and \
+              a[besti-1] == b[bestj-1]:
+            besti, bestj, bestsize = besti-1, bestj-1, bestsize+1
+        while besti+bestsize < ahi and bestj+bestsize < bhi and \
+              not isbjunk(b[bestj+bestsize]) and \
+              a[besti+bestsize] == b[bestj+bestsize]:
+            bestsize += 1
+
+        while besti > alo and bestj > blo and \
+              isbjunk(b[bestj-1]) and \
+              a[besti-1] == b[bestj-1]:
+            besti, bestj, bestsize = besti-1, bestj-1, bestsize+1
+        while besti+bestsize < ahi and bestj+bestsize < bhi and \
+              isbjunk(b[bestj+bestsize]) and \
+              a[besti+bestsize] == b[bestj+bestsize]:
+            bestsize = bestsize + 1
+
+        return besti, bestj, bestsize
+
+    def get_runs(self):
+        """
+        Returns:
+            a table that for each i and j contains the length of the match (of elements of b2j) that ends in a[i]
+            and b[j]. The table is calculated once for the two sequences.
+        """
+        if self.runs is None:
+            a, b2j = self.a, self.b2j
+            nothing = []
+            prev_row = [0] * len(self.b)
+            self.runs = []
+            for i in range(len(a)):
+                row = [0] * len(self.b)
+                for j in b2j.get(a[i], nothing):
+                    row[j] = prev_row[j-1] + 1 if j > 0 else 1
+                self.runs.append(prev_row := row)
+
+        return self.runs
+
+    def iter_longest_matches(self, alo=0, blo=0, ahi=None, bhi=None, min_size=1):
+        """
+        Finds the same matches as find_longest_matches(alo, i, blo, j) for all the ranges a[alo:i] and b[blo:j],
+        but derives the longest matches of each range from the ranges smaller than it, and from the table of the
+        matches that end in each two indices, instead of scanning b2j for every range.
+
+        Yields:
+            for each i in range(alo + 1, ahi + 1), and for each j in range(blo + 1, bhi + 1), a tuple of i, j and the
+            list of the longest matches between a[alo:i] and b[blo:j] (or None if they are shorter than min_size).
+        """
+        if ahi is None:
+            ahi = len(self.a)
+        if bhi is None:
+            bhi = len(self.b)
+
+        runs = self.get_runs()
+        extend = len(self.bjunk) > 0 or len(self.bpopular) > 0
+
+        # For each j, the size and the matches (as a tree of tuples, to avoid copying lists) of the longest matches
+        # between a[alo:i] and b[blo:j], when i is the previous row.
+        sizes = [0] * (bhi - blo)
+        bests = [None] * (bhi - blo)
+
+        for i in range(alo, ahi):
+            row, max_size = runs[i], i - alo + 1
+            row_size, row_bests = 0, None
+            for j in range(blo, bhi):
+                if (k := row[j]) > 0:
+                    if k > max_size:
+                        k = max_size
+                    if k > j - blo + 1:
+                        k = j - blo + 1
+
+                    if k > row_size:
+                        row_size, row_bests = k, (i-k+1, j-k+1, k)
+                    elif k == row_size:
+                        row_bests = (row_bests, (i-k+1, j-k+1, k))
+
+                size, best = sizes[j - blo], bests[j - blo]
+                if row_size > size:
+                    size, best = row_size, row_bests
+                elif row_size == size and size > 0:
+                    best = (best, row_bests)
+                sizes[j - blo], bests[j - blo] = size, best
+
+                if size < min_size and not extend:
+                    yield i + 1, j + 1, None
+                elif best is None:
+                    yield i + 1, j + 1, [Match(*self.__extend_match(alo, blo, 0, alo, i + 1, blo, j + 1))
+                                         if extend else Match(alo, blo, 0)]
+                else:
+                    matches = []
+                    stack = [best]
+                    while stack:
+                        if len(node := stack.pop()) == 2:
+                            stack.append(node[1])
+                            stack.append(node[0])
+                        elif extend:
+                            matches.append(Match(*self.__extend_match(*node, alo, i + 1, blo, j + 1)))
+                        else:
+                            matches.append(Match(*node))
+
+                    yield i + 1, j + 1, matches
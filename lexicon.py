@@ -0,0 +1,397 @@
+import sys
+import csv
+import mmap
+import struct
+import threading
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping
+from os.path import exists
+
+
+# The header of a compiled lexicon: the magic, the number of the words, the numbers of the related words in each
+# relation (the synonyms, the plurals, the related words and the singulars, see word_relations()), and the number of
+# the bytes of the words
+MAGIC = b'NMLEX\x00\x02\x00'
+HEADER = struct.Struct('<8s6I')
+
+# The maximal number of the words that each cache of the lexicon keeps
+CACHE_SIZE = 65536
+
+
+def read_csv_lexicon(synonyms_path, plurals_path):
+    """
+    Reads the synonyms and the plurals from their CSV files. A missing file is read as an empty lexicon (so the
+    semantic matching still works, by the rest of the relations).
+
+    Args:
+        synonyms_path: the path of the synonyms file (with the columns 'word' and 'synonyms')
+        plurals_path: the path of the plurals file (with the columns 'word' and 'plural')
+
+    Returns:
+        a tuple of two dictionaries, that for each word contain the list of its synonyms, and the list of its plurals
+    """
+    def read(path, column):
+        if path is None or not exists(path):
+            return {}
+        with open(path, newline='') as csvfile:
+            return {row['word']: row[column].split(',') for row in csv.DictReader(csvfile)}
+
+    return read(synonyms_path, 'synonyms'), read(plurals_path, 'plural')
+
+
+def word_relations(synonyms, plurals):
+    """
+    Normalizes the synonyms and the plurals to one bidirectional relation: two words are related if one of them is a
+    synonym, the plural or the singular of the other (a word isn't related to itself, and empty words are ignored).
+
+    Args:
+        synonyms: a mapping that for each word contains the list of its synonyms
+        plurals: a mapping that for each word contains the list of its plurals
+
+    Returns:
+        a tuple of two dictionaries, that for each word contain the set of its related words, and the set of its
+        singulars
+    """
+    related = {}
+    singulars = {}
+
+    for relation in (synonyms, plurals):
+        for word, words in relation.items():
+            for other in words:
+                if word and other and other != word:
+                    related.setdefault(word, set()).add(other)
+                    related.setdefault(other, set()).add(word)
+                    if relation is plurals:
+                        singulars.setdefault(other, set()).add(word)
+
+    return related, singulars
+
+
+def _to_little_endian(values):
+    values = array('I', values)
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values.tobytes()
+
+
+def compile_lexicon(synonyms, plurals, path):
+    """
+    Compiles the synonyms and the plurals to a binary file, that could be loaded (by CompiledLexicon) without parsing:
+    each word is saved once (as UTF-8, in a sorted table of strings), and each relation is saved as integer
+    adjacency lists (the ids of the related words of each word). The normalized relation of word_relations() is
+    saved too, so it isn't built again when the file is loaded.
+
+    Args:
+        synonyms: a dictionary that for each word contains the list of its synonyms
+        plurals: a dictionary that for each word contains the list of its plurals
+        path: the path of the compiled file
+
+    Returns:
+        None
+    """
+    words = sorted(set(synonyms).union(plurals, *synonyms.values(), *plurals.values()))
+    ids = {word: i for i, word in enumerate(words)}
+
+    encoded = [word.encode('utf-8') for word in words]
+    word_offsets = [0]
+    for word in encoded:
+        word_offsets.append(word_offsets[-1] + len(word))
+
+    # The sets of the normalized relation are sorted, so compiling the same lexicon gives the same file
+    related, singulars = word_relations(synonyms, plurals)
+    related = {word: sorted(words) for word, words in related.items()}
+    singulars = {word: sorted(words) for word, words in singulars.items()}
+
+    relations = []
+    for relation in (synonyms, plurals, related, singulars):
+        offsets = [0]
+        targets = []
+        for word in words:
+            targets.extend(ids[other] for other in relation.get(word, ()))
+            offsets.append(len(targets))
+        relations.append((offsets, targets))
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(words), *(len(targets) for offsets, targets in relations), word_offsets[-1]))
+        f.write(_to_little_endian(word_offsets))
+        for offsets, targets in relations:
+            f.write(_to_little_endian(offsets))
+            f.write(_to_little_endian(targets))
+        f.write(b''.join(encoded))
+
+
+class LRUCache:
+    """
+    A cache of the recently used keys: when it is full, the least recently used key is dropped. It is locked, so
+    it could be shared by threads.
+    """
+
+    def __init__(self, max_size=CACHE_SIZE):
+        """
+        Args:
+            max_size: the maximal number of the kept keys
+        """
+        self.max_size = max_size
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.items)
+
+    def get(self, key, default=None):
+        """
+        Returns:
+            the value of a key, or default if it isn't in the cache
+        """
+        with self.lock:
+            try:
+                self.items.move_to_end(key)
+            except KeyError:
+                return default
+            return self.items[key]
+
+    def put(self, key, value):
+        """
+        Keeps the value of a key (and drops the least recently used key, if the cache is full).
+
+        Returns:
+            the value
+        """
+        with self.lock:
+            self.items[key] = value
+            self.items.move_to_end(key)
+            if len(self.items) > self.max_size:
+                self.items.popitem(last=False)
+        return value
+
+
+class LexiconRelation(Mapping):
+    """
+    A read-only dictionary view of one relation of a compiled lexicon (the synonyms or the plurals), that for each word
+    contains the list of its related words (like the dictionaries of read_csv_lexicon()). The recently looked up words
+    are kept (see LRUCache), so a word that is checked again isn't searched again.
+    """
+
+    def __init__(self, lexicon, offsets, targets):
+        self.lexicon = lexicon
+        self.offsets = offsets
+        self.targets = targets
+        # The related words of the looked up words (an empty tuple for a word that isn't in the relation)
+        self.cache = LRUCache()
+
+    def __getitem__(self, word):
+        if (related := self.cache.get(word)) is None:
+            related = ()
+            if (word_id := self.lexicon.word_id(word)) is not None and \
+                    (start := self.offsets[word_id]) != (end := self.offsets[word_id + 1]):
+                related = [self.lexicon.word(target) for target in self.targets[start:end]]
+            self.cache.put(word, related)
+
+        if not related:
+            raise KeyError(word)
+        return related
+
+    def __iter__(self):
+        offsets = self.offsets
+        return (self.lexicon.word(i) for i in range(len(offsets) - 1) if offsets[i] != offsets[i + 1])
+
+    def __len__(self):
+        offsets = self.offsets
+        return sum(1 for i in range(len(offsets) - 1) if offsets[i] != offsets[i + 1])
+
+
+class CompiledLexicon:
+    """
+    A lexicon that was compiled by compile_lexicon(). The file is memory-mapped, so loading it doesn't read or parse
+    it: a word is found by a binary search in the sorted table of the words, and only the words that are used are
+    decoded (the recently decoded words are kept, see LRUCache).
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: the path of the compiled file
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, num_of_words, *nums_of_targets, blob_len = HEADER.unpack_from(self.mmap)
+        if magic != MAGIC:
+            raise Exception(f'{path} is not a compiled lexicon.')
+
+        buffer = memoryview(self.mmap)
+        pos = HEADER.size
+
+        def take(length):
+            nonlocal pos
+            values = buffer[pos: pos + 4 * length]
+            pos += 4 * length
+            if sys.byteorder == 'little':
+                return values.cast('I')
+            values = array('I', values)
+            values.byteswap()
+            return values
+
+        self.word_offsets = take(num_of_words + 1)
+        relations = [(take(num_of_words + 1), take(num_of_targets)) for num_of_targets in nums_of_targets]
+        # The words are read from the map itself (its slices are bytes, that could be compared)
+        self.blob_start = pos
+        if len(self.mmap) < pos + blob_len:
+            raise Exception(f'The compiled lexicon {path} is truncated.')
+
+        # The recently decoded words, by their ids
+        self.words = LRUCache()
+
+        self.synonyms = LexiconRelation(self, *relations[0])
+        self.plurals = LexiconRelation(self, *relations[1])
+        self.relations = CompiledWordRelations(self, *relations[2], *relations[3])
+
+    def __len__(self):
+        return len(self.word_offsets) - 1
+
+    def word(self, word_id):
+        """
+        Returns:
+            the word of an id
+        """
+        if (word := self.words.get(word_id)) is None:
+            start = self.blob_start
+            encoded = self.mmap[start + self.word_offsets[word_id]: start + self.word_offsets[word_id + 1]]
+            word = self.words.put(word_id, encoded.decode('utf-8'))
+        return word
+
+    def word_id(self, word):
+        """
+        Returns:
+            the id of a word, or None if it isn't in the lexicon
+        """
+        encoded = word.encode('utf-8')
+        blob, start, offsets = self.mmap, self.blob_start, self.word_offsets
+
+        low, high = 0, len(offsets) - 1
+        while low < high:
+            mid = (low + high) // 2
+            if blob[start + offsets[mid]: start + offsets[mid + 1]] < encoded:
+                low = mid + 1
+            else:
+                high = mid
+
+        return low if low < len(offsets) - 1 and blob[start + offsets[low]: start + offsets[low + 1]] == encoded \
+            else None
+
+
+class WordRelations:
+    """
+    An index of the bidirectional relation between words (see word_relations()): each word has an id, and each id has
+    a frozenset of the ids of its related words, so checking if two words are related is a few hash lookups.
+    The forms of a word are the word itself, its stems by the plural suffixes ('ies' to 'y', 'es', and 's' that
+    doesn't follow another 's') and its singulars, as long as they are in the index. Two words are related if a
+    form of one of them is related to a form of the other. The forms and the related ids of the recently checked
+    words are kept (see LRUCache), so a word that is checked again isn't looked up again.
+    """
+
+    def __init__(self, synonyms=None, plurals=None):
+        """
+        Args:
+            synonyms: a mapping that for each word contains the list of its synonyms (None for no synonyms)
+            plurals: a mapping that for each word contains the list of its plurals (None for no plurals)
+        """
+        related, singulars = word_relations(synonyms or {}, plurals or {})
+        self.ids = {word: i for i, word in enumerate(related)}
+        self.related_ids = [frozenset(self.ids[other] for other in words) for words in related.values()]
+        self.singular_ids = {self.ids[word]: frozenset(self.ids[other] for other in words)
+                             for word, words in singulars.items()}
+
+        # The forms of the recently checked words, and the ids of the words that are related to their forms
+        self.forms_cache = LRUCache()
+        self.neighbours_cache = LRUCache()
+
+    def _word_id(self, word):
+        return self.ids.get(word)
+
+    def _related_ids(self, word_id):
+        return self.related_ids[word_id]
+
+    def _singular_ids(self, word_id):
+        return self.singular_ids.get(word_id, ())
+
+    @staticmethod
+    def stems(word):
+        """
+        Returns:
+            a list of the possible singulars of a word by the plural suffixes (that may not be real words)
+        """
+        stems = []
+        if len(word) > 3 and word.endswith('ies'):
+            stems.append(word[:-3] + 'y')
+        if len(word) > 2 and word.endswith('es'):
+            stems.append(word[:-2])
+        if len(word) > 1 and word.endswith('s') and not word.endswith('ss'):
+            stems.append(word[:-1])
+
+        return stems
+
+    def forms(self, word):
+        """
+        Returns:
+            a frozenset of the ids of the forms of a word (see the class documentation)
+        """
+        if (forms := self.forms_cache.get(word)) is None:
+            ids = {word_id for form in [word] + self.stems(word) if (word_id := self._word_id(form)) is not None}
+            for word_id in list(ids):
+                ids.update(self._singular_ids(word_id))
+            forms = self.forms_cache.put(word, frozenset(ids))
+
+        return forms
+
+    def neighbours(self, word):
+        """
+        Returns:
+            a frozenset of the ids of the words that are related to the forms of a word
+        """
+        if (neighbours := self.neighbours_cache.get(word)) is None:
+            neighbours = self.neighbours_cache.put(
+                word, frozenset().union(*(self._related_ids(word_id) for word_id in self.forms(word))))
+
+        return neighbours
+
+    def related(self, word_1, word_2):
+        """
+        Returns:
+            True if a form of one of the words is related to a form of the other, False otherwise
+        """
+        return not self.neighbours(word_1).isdisjoint(self.forms(word_2))
+
+
+class CompiledWordRelations(WordRelations):
+    """
+    The WordRelations of a compiled lexicon: the ids are the ids of the words in the lexicon, and the related ids of
+    each word are read from its adjacency list (when it is first checked).
+    """
+
+    def __init__(self, lexicon, related_offsets, related_targets, singulars_offsets, singulars_targets):
+        self.lexicon = lexicon
+        self.related_offsets, self.related_targets = related_offsets, related_targets
+        self.singulars_offsets, self.singulars_targets = singulars_offsets, singulars_targets
+        self.forms_cache = LRUCache()
+        self.neighbours_cache = LRUCache()
+
+    def _word_id(self, word):
+        return self.lexicon.word_id(word)
+
+    def _related_ids(self, word_id):
+        return self.related_targets[self.related_offsets[word_id]: self.related_offsets[word_id + 1]]
+
+    def _singular_ids(self, word_id):
+        return self.singulars_targets[self.singulars_offsets[word_id]: self.singulars_offsets[word_id + 1]]
+
+
+if __name__ == '__main__':
+    # python lexicon.py <compiled path> <synonyms csv> <plurals csv>
+    if len(sys.argv) != 4:
+        print(f'Usage: python {sys.argv[0]} <compiled path> <synonyms csv> <plurals csv>')
+        sys.exit(1)
+
+    compile_lexicon(*read_csv_lexicon(sys.argv[2], sys.argv[3]), sys.argv[1])
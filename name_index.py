@@ -0,0 +1,293 @@
+import json
+from bisect import bisect_left
+from collections import Counter
+from names_matcher import NamesMatcher
+
+
+class NameIndex:
+    """
+    An index of many names, that retrieves the candidates that could be similar to a query (the names that share a
+    word with it, or enough character q-grams of their normalized names) without comparing the query to all the names,
+    and then reranks them by one of the ratio methods of NamesMatcher.
+    The names are divided to words by the matcher (so the words and the normalized names are the same as in the
+    matching), and the index could be saved to a file and loaded again.
+    """
+
+    def __init__(self, matcher=None, q=3):
+        """
+        Args:
+            matcher: the NamesMatcher that divides the names to words and reranks the candidates (None for a default
+                     one)
+            q: the length of the character q-grams
+        """
+        self.matcher = matcher if matcher is not None else NamesMatcher()
+        self.q = q
+
+        # The words of each name, and its order of insertion (for stable ordering of the candidates)
+        self.names = {}
+        self.ids = {}
+        self.next_id = 0
+
+        # The inverted lists: the names that contain each word and each q-gram, and the number of q-grams of each name
+        self.word_lists = {}
+        self.qgram_lists = {}
+        self.num_of_qgrams = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def _qgrams(self, norm_name):
+        """
+        Args:
+            norm_name: a normalized name
+
+        Returns:
+            the set of the q-grams of the name (or the name itself, if it is shorter than q)
+        """
+        if len(norm_name) <= self.q:
+            return {norm_name} if norm_name else set()
+
+        return {norm_name[i:i + self.q] for i in range(len(norm_name) - self.q + 1)}
+
+    def _stop_words(self):
+        """
+        Returns:
+            the set of the stop words of the matcher, that aren't indexed (because too many names contain them)
+        """
+        return set(self.matcher.stop_words)
+
+    def add(self, name, words=None):
+        """
+        Adds a name to the index (if it isn't there already).
+
+        Args:
+            name: a name
+            words: the words of the name (None for dividing it by the matcher)
+
+        Returns:
+            None
+        """
+        if name in self.names:
+            return
+
+        words = words if words is not None else self.matcher._tokenize(name)[0]
+        self.names[name] = words
+        self.ids[name] = self.next_id
+        self.next_id += 1
+
+        stop_words = self._stop_words()
+        for word in set(words):
+            if word not in stop_words:
+                self.word_lists.setdefault(word, set()).add(name)
+
+        qgrams = self._qgrams(''.join(words))
+        self.num_of_qgrams[name] = len(qgrams)
+        for qgram in qgrams:
+            self.qgram_lists.setdefault(qgram, set()).add(name)
+
+    def add_many(self, names):
+        """
+        Adds many names to the index.
+
+        Args:
+            names: an iterable of names
+
+        Returns:
+            None
+        """
+        names = list(names)
+        for name, words in zip(names, self.matcher.tokenize_many(names)):
+            self.add(name, words)
+
+    def remove(self, name):
+        """
+        Removes a name from the index.
+
+        Args:
+            name: a name in the index
+
+        Returns:
+            None
+        """
+        if name not in self.names:
+            raise Exception(f'The name {name} is not in the index.')
+
+        words = self.names.pop(name)
+        del self.ids[name]
+        del self.num_of_qgrams[name]
+
+        for word in set(words):
+            if (names := self.word_lists.get(word)) is not None:
+                names.discard(name)
+                if not names:
+                    del self.word_lists[word]
+
+        for qgram in self._qgrams(''.join(words)):
+            names = self.qgram_lists[qgram]
+            names.discard(name)
+            if not names:
+                del self.qgram_lists[qgram]
+
+    def candidates(self, query, min_qgram_ratio=0.5):
+        """
+        Retrieves the names that share a word with the query (except the stop words), or that the Dice coefficient
+        of their q-grams and the q-grams of the query is at least min_qgram_ratio.
+        Note: it is a filter by the common words and letters, and not a bound of the ratio of a specific method.
+
+        Args:
+            query: a name
+            min_qgram_ratio: the minimal Dice coefficient (2 * common q-grams / sum of the numbers of q-grams) of a
+                             candidate that doesn't share a word with the query
+
+        Returns:
+            a list of the candidates, in the order of their insertion to the index
+        """
+        words = self.matcher._tokenize(query)[0]
+        stop_words = self._stop_words()
+
+        res = set()
+        for word in set(words):
+            if word not in stop_words:
+                res.update(self.word_lists.get(word, ()))
+
+        qgrams = self._qgrams(''.join(words))
+        common_qgrams = Counter()
+        for qgram in qgrams:
+            common_qgrams.update(self.qgram_lists.get(qgram, ()))
+
+        for name, common in common_qgrams.items():
+            if name not in res and 2 * common >= min_qgram_ratio * (len(qgrams) + self.num_of_qgrams[name]):
+                res.add(name)
+
+        return sorted(res, key=self.ids.__getitem__)
+
+    def search(self, query, k=3, method='ordered_match', cutoff=0.0, min_qgram_ratio=0.5, **params):
+        """
+        Finds the k names in the index that are the most similar to the query: retrieves the candidates (see
+        candidates()), and reranks them by the method (see NamesMatcher.best_matches()).
+        Note: the search is approximate. The candidates are filtered by their common words and q-grams, and a name
+        could have a high ratio without them (by similar words, or by common letters that aren't in common q-grams),
+        so the best names that aren't candidates are missed. Compare the query to all the names by
+        NamesMatcher.best_matches() for an exact search.
+
+        Args:
+            query: a name
+            k: the maximal number of the returned names
+            method: the ratio method of NamesMatcher (or its name)
+            cutoff: the minimal ratio of a returned candidate (it filters the reranked candidates, and doesn't make the
+                    retrieval exact)
+            min_qgram_ratio: the minimal Dice coefficient of the q-grams of a candidate (see candidates())
+            **params: the parameters that will be passed to the method
+
+        Returns:
+            a list of (name, ratio) of the best candidates, sorted by descending ratio
+        """
+        return self.matcher.best_matches(query, self.candidates(query, min_qgram_ratio), k, method, cutoff,
+                                         **params)
+
+    def save(self, path):
+        """
+        Saves the index (its settings, and the names with their words) to a JSON file.
+
+        Args:
+            path: the path of the file
+
+        Returns:
+            None
+        """
+        with open(path, 'w') as f:
+            json.dump({'q': self.q, 'matcher': self.matcher.get_config(),
+                       'names': [[name, words] for name, words in self.names.items()]}, f)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads an index that was saved by save(). The names aren't divided to words again.
+
+        Args:
+            path: the path of the file
+
+        Returns:
+            NameIndex
+        """
+        with open(path) as f:
+            data = json.load(f)
+
+        index = cls(NamesMatcher(**data['matcher']), data['q'])
+        for name, words in data['names']:
+            index.add(name, words)
+
+        return index
+
+
+class VocabularyIndex:
+    """
+    An index of a vocabulary of words, that retrieves all the words that have the same meaning as a word (see
+    NamesMatcher.words_meaning()) in one query, instead of checking each word of the vocabulary: the words that start
+    with it are found by a binary search in the sorted vocabulary, the words that it starts with by its prefixes, and
+    the synonyms and plurals by the ids of the forms of the words (see lexicon.WordRelations).
+    The synonyms and plurals are the ones of NamesMatcher when the index is created.
+    """
+
+    def __init__(self, vocabulary):
+        """
+        Args:
+            vocabulary: an iterable of words
+        """
+        self.relations = NamesMatcher._load_lexicon()
+
+        self.words = sorted(set(vocabulary))
+        self.word_set = set(self.words)
+
+        # The words of the vocabulary that each id is one of their forms
+        self.words_by_form = {}
+        for word in self.words:
+            for word_id in self.relations.forms(word):
+                self.words_by_form.setdefault(word_id, []).append(word)
+
+    def __len__(self):
+        return len(self.words)
+
+    def __contains__(self, word):
+        return word in self.word_set
+
+    def related(self, word):
+        """
+        Retrieves the words of the vocabulary that have the same meaning as a word: the synonyms and the plurals of
+        its forms, the words that start with it and the words that it starts with (if they are long enough, see
+        NamesMatcher.MEANING_MIN_PREFIX_LEN).
+
+        Args:
+            word: a word (that may not be in the vocabulary)
+
+        Returns:
+            a sorted list of the words, that words_meaning(word, w) is True for each of them
+        """
+        res = set()
+        for word_id in self.relations.neighbours(word):
+            res.update(self.words_by_form.get(word_id, ()))
+
+        min_len = NamesMatcher.MEANING_MIN_PREFIX_LEN
+        if len(word) >= min_len:
+            i = bisect_left(self.words, word)
+            while i < len(self.words) and self.words[i].startswith(word):
+                res.add(self.words[i])
+                i += 1
+
+        for length in range(min_len, len(word) + 1):
+            if word[:length] in self.word_set:
+                res.add(word[:length])
+
+        return sorted(res)
+
+    def neighbours(self):
+        """
+        Retrieves the related words (see related()) of all the words of the vocabulary.
+
+        Returns:
+            a dictionary that for each word of the vocabulary contains the sorted list of its related words
+        """
+        return {word: self.related(word) for word in self.words}
@@ -0,0 +1,268 @@
+from array import array
+from difflib import Match
+
+
+class SuffixAutomaton:
+    """
+    A suffix automaton of a sequence: the minimal automaton that accepts all the suffixes of the sequence, so each
+    sub-sequence of it is a path from the root. It is built in O(n), and finds the longest common substring of the
+    sequence and another one in O(m).
+    """
+    # Replaces the consumed elements of the sequence, so no match will contain them
+    CONSUMED = object()
+
+    def __init__(self, seq=(), consumed=None, positions=None):
+        """
+        Args:
+            seq: the sequence (string or list of hashable elements)
+            consumed: a mask (a bytearray, or None) of the elements of the sequence that can't be part of a match
+            positions: the indices of the elements of the sequence that the automaton is built of, in ascending order
+                (None for all of them)
+        """
+        # For each state: its transitions, its suffix link, the length of its longest string, and the end index
+        # of the first occurrence of its strings in the sequence
+        self.next = [{}]
+        self.link = [-1]
+        self.length = [0]
+        self.first_end = [-1]
+        self.last = 0
+
+        for pos in range(len(seq)) if positions is None else positions:
+            self.extend(seq[pos] if consumed is None or not consumed[pos] else SuffixAutomaton.CONSUMED, pos)
+
+    def extend(self, c, pos):
+        """
+        Adds an element to the end of the sequence
+
+        Args:
+            c: the element
+            pos: its index in the sequence
+
+        Returns:
+            None
+        """
+        nxt, link, length, first_end = self.next, self.link, self.length, self.first_end
+
+        cur = len(length)
+        nxt.append({})
+        link.append(0)
+        length.append(length[self.last] + 1)
+        first_end.append(pos)
+
+        p = self.last
+        while p != -1 and c not in nxt[p]:
+            nxt[p][c] = cur
+            p = link[p]
+
+        if p != -1:
+            q = nxt[p][c]
+            if length[p] + 1 == length[q]:
+                link[cur] = q
+            else:
+                clone = len(length)
+                nxt.append(nxt[q].copy())
+                link.append(link[q])
+                length.append(length[p] + 1)
+                first_end.append(first_end[q])
+
+                while p != -1 and nxt[p].get(c) == q:
+                    nxt[p][c] = clone
+                    p = link[p]
+                link[q] = link[cur] = clone
+
+        self.last = cur
+
+    def find_longest_match(self, a, alo=0, ahi=None, consumed=None):
+        """
+        Finds the longest sub-sequence of a[alo:ahi] that is also a sub-sequence of the automaton's sequence (b).
+        Like difflib.SequenceMatcher.find_longest_match(), if there are some longest matches, it returns the one that
+        starts earliest in a, and of all those, the one that starts earliest in b.
+
+        Args:
+            a: a sequence
+            alo: the start of the range in a
+            ahi: the end of the range in a
+            consumed: a mask (a bytearray, or None) of the elements of a that can't be part of a match
+
+        Returns:
+            Match(i, j, k) such that a[i:i+k] == b[j:j+k] (k is 0 if there is no match)
+        """
+        if ahi is None:
+            ahi = len(a)
+
+        best_size, best_end, best_end_b = self.scan(a, range(alo, ahi), consumed)
+        if best_size == 0:
+            return Match(alo, 0, 0)
+
+        return Match(best_end - best_size + 1, best_end_b - best_size + 1, best_size)
+
+    def scan(self, a, positions, consumed=None):
+        """
+        Finds the longest match between the elements of a (in the given positions, as they were a sequence) and the
+        automaton's sequence.
+
+        Args:
+            a: a sequence
+            positions: the indices of the elements of a to scan, in ascending order
+            consumed: a mask (a bytearray, or None) of the elements of a that can't be part of a match
+
+        Returns:
+            a tuple of the length of the longest match, and the positions of its last elements in a and in b
+        """
+        nxt, link, length = self.next, self.link, self.length
+
+        best_size, best_end, best_state = 0, -1, 0
+        state, size = 0, 0
+
+        for i in positions:
+            if consumed is not None and consumed[i]:
+                state, size = 0, 0
+                continue
+
+            c = a[i]
+            if c in nxt[state]:
+                state = nxt[state][c]
+                size += 1
+            else:
+                while state != -1 and c not in nxt[state]:
+                    state = link[state]
+                if state == -1:
+                    state, size = 0, 0
+                    continue
+                size = length[state] + 1
+                state = nxt[state][c]
+
+            if size > best_size:
+                best_size, best_end, best_state = size, i, state
+
+        return best_size, best_end, self.first_end[best_state]
+
+
+class LongestMatchFinder:
+    """
+    Finds the longest match between two sequences (like ExtendedSequenceMatcher.find_longest_match()), by a suffix
+    automaton of the second sequence, in O(m+n) instead of O(mn).
+    Unlike difflib, it doesn't ignore "popular" elements of long sequences, so it always finds the real longest match.
+    After finding a match, its elements could be consumed, so the next matches won't contain them (without changing
+    the sequences), or removed, so their both sides could be a part of the same match (the surviving elements are kept
+    in linked lists, so the sequences aren't copied, and the matches are returned in the original indices).
+    """
+
+    def __init__(self, a='', b=''):
+        """
+        Args:
+            a: the first sequence
+            b: the second sequence
+        """
+        self.a = self.b = self.automaton = None
+        self.consumed_a = self.consumed_b = None
+        # The linked lists of the surviving elements (the end of each list is the length of the sequence)
+        self.first_a = self.next_a = self.prev_a = None
+        self.first_b = self.next_b = self.prev_b = None
+        self.set_seqs(a, b)
+
+    def set_seqs(self, a, b):
+        self.set_seq1(a)
+        self.set_seq2(b)
+
+    def set_seq1(self, a):
+        self.a = a
+        self.consumed_a = bytearray(len(a))
+        self.first_a, self.next_a, self.prev_a = self._init_positions(len(a))
+
+    def set_seq2(self, b):
+        self.b = b
+        self.consumed_b = bytearray(len(b))
+        self.first_b, self.next_b, self.prev_b = self._init_positions(len(b))
+        self.automaton = None
+
+    @staticmethod
+    def _init_positions(n):
+        return (0 if n > 0 else None), array('i', range(1, n + 1)), array('i', range(-1, n - 1))
+
+    @staticmethod
+    def _iter_positions(first, nxt):
+        i = first
+        while i is not None and i < len(nxt):
+            yield i
+            i = nxt[i]
+
+    @staticmethod
+    def _remove_positions(i, k, first, nxt, prev):
+        """
+        Unlinks k surviving elements from a linked list, starting in the element i.
+
+        Returns:
+            a tuple of the new first element, and the list of the removed indices
+        """
+        removed = []
+        end = i
+        for _ in range(k):
+            removed.append(end)
+            end = nxt[end]
+
+        before = prev[i]
+        if end < len(nxt):
+            prev[end] = before
+        if before >= 0:
+            nxt[before] = end
+        else:
+            first = end if end < len(nxt) else None
+
+        return first, removed
+
+    def consume(self, i, j, k):
+        """
+        Marks a[i:i+k] and b[j:j+k] as consumed, so they won't be part of the next matches.
+
+        Args:
+            i: the start of the consumed elements in a
+            j: the start of the consumed elements in b
+            k: the number of the consumed elements
+
+        Returns:
+            None
+        """
+        self.consumed_a[i:i + k] = b'\x01' * k
+        self.consumed_b[j:j + k] = b'\x01' * k
+        self.automaton = None
+
+    def remove(self, i, j, k):
+        """
+        Removes k surviving elements of a, starting in a[i], and k surviving elements of b, starting in b[j], so the
+        elements before and after them become adjacent.
+
+        Args:
+            i: the index of the first removed element in a
+            j: the index of the first removed element in b
+            k: the number of the removed elements
+
+        Returns:
+            a tuple of the lists of the (original) indices of the removed elements in a and in b
+        """
+        self.first_a, removed_a = self._remove_positions(i, k, self.first_a, self.next_a, self.prev_a)
+        self.first_b, removed_b = self._remove_positions(j, k, self.first_b, self.next_b, self.prev_b)
+        self.automaton = None
+
+        return removed_a, removed_b
+
+    def find_longest_match(self):
+        """
+        Returns:
+            Match(i, j, k) of the longest match between the surviving elements of a and b that weren't consumed: a[i]
+            and b[j] are the first elements of the match (in the original indices), and k is the number of the elements
+            in it (0 if there is no match)
+        """
+        if self.automaton is None:
+            self.automaton = SuffixAutomaton(self.b, self.consumed_b, self._iter_positions(self.first_b, self.next_b))
+
+        k, i, j = self.automaton.scan(self.a, self._iter_positions(self.first_a, self.next_a), self.consumed_a)
+        if k == 0:
+            return Match(0, 0, 0)
+
+        # Going back from the last elements of the match to the first ones
+        for _ in range(k - 1):
+            i = self.prev_a[i]
+            j = self.prev_b[j]
+
+        return Match(i, j, k)